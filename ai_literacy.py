@@ -3,15 +3,101 @@ AI Literacy Platform - Core Structure (FIXED)
 A comprehensive platform for teaching AI literacy through interactive modules and scenario-based learning.
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, asdict, replace
+from typing import Dict, DefaultDict, FrozenSet, List, Optional, Any, Set, Tuple, Iterator
+from collections import defaultdict, namedtuple
 from enum import Enum
+from functools import lru_cache
+from operator import attrgetter
+import asyncio
+import heapq
 import json
-import uuid
+import os
+import sqlite3
+import sys
+import time
 from datetime import datetime, timedelta
 import random
 
+# Timestamps on hot paths are integer microseconds since the epoch;
+# convert to datetime only when data leaves the platform
+def _now_us() -> int:
+    """Return the current time in microseconds since the epoch."""
+    return time.time_ns() // 1000
+
+def _us_to_datetime(us: int) -> datetime:
+    """Convert epoch microseconds to a naive local datetime."""
+    return datetime.fromtimestamp(us // 1_000_000).replace(microsecond=us % 1_000_000)
+
+def _datetime_to_us(dt: datetime) -> int:
+    """Convert a naive local datetime to epoch microseconds."""
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000 + dt.microsecond
+
+def _parse_timestamps(values: List[str]) -> List[int]:
+    """Parse ISO-8601 timestamps to epoch microseconds in bulk."""
+    return [_datetime_to_us(datetime.fromisoformat(value)) for value in values]
+
+def _write_text(filename: str, text: str):
+    """Write text to a file in a single call."""
+    with open(filename, 'w') as f:
+        f.write(text)
+
+def _read_json(filename: str) -> Any:
+    """Read and parse a JSON file."""
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+def _new_id() -> str:
+    """Return a random 128-bit identifier as 32 hex characters."""
+    return os.urandom(16).hex()
+
+class _VersionedDict(dict):
+    """Dict that counts its mutations, so indexes built from it can detect changes."""
+    
+    # Class default so unpickling, which restores items before __init__ runs, works
+    version = 0
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+    
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+    
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+    
+    def __ior__(self, other):
+        self.update(other)
+        return self
+    
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+    
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+    
+    def clear(self):
+        super().clear()
+        self.version += 1
+    
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+    
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.version += 1
+        return super().setdefault(key, default)
+
 # Core Data Models
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 class UserRole(Enum):
     STUDENT = "student"
     TEACHER = "teacher"
@@ -22,6 +108,13 @@ class DifficultyLevel(Enum):
     INTERMEDIATE = "intermediate"
     ADVANCED = "advanced"
 
+# Ordering used when presenting learning paths
+_DIFFICULTY_ORDER = {
+    DifficultyLevel.BEGINNER: 1,
+    DifficultyLevel.INTERMEDIATE: 2,
+    DifficultyLevel.ADVANCED: 3
+}
+
 class ModuleCategory(Enum):
     AI_BASICS = "ai_basics"
     APPLICATIONS = "applications"
@@ -29,267 +122,599 @@ class ModuleCategory(Enum):
     CRITICAL_THINKING = "critical_thinking"
     PRACTICAL_SKILLS = "practical_skills"
 
-@dataclass
+# Human-readable labels, e.g. ModuleCategory.ETHICS_BIAS.display == "Ethics Bias"
+for _member in (*DifficultyLevel, *ModuleCategory):
+    _member.display = _member.value.replace('_', ' ').title()
+del _member
+
+@lru_cache(maxsize=4096)
+def _display_name(username: str) -> str:
+    """Format a username for display; memoized since usernames rarely change."""
+    return username.replace('_', ' ').title()
+
+@dataclass(**_SLOTS)
 class User:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_new_id)
     username: str = ""
     email: str = ""
     role: UserRole = UserRole.STUDENT
     created_at: datetime = field(default_factory=datetime.now)
     learning_preferences: Dict[str, Any] = field(default_factory=dict)
     progress: Dict[str, float] = field(default_factory=dict)  # module_id -> completion %
+    
+    def __post_init__(self):
+        # IDs are dict keys everywhere; interned strings compare by identity
+        self.id = sys.intern(self.id)
+        self.progress = {sys.intern(module_id): pct for module_id, pct in self.progress.items()}
+    
+    @property
+    def display_name(self) -> str:
+        """Username formatted for display, e.g. "Emma Chen"."""
+        return _display_name(self.username)
+
+@dataclass(frozen=True, **_SLOTS)
+class ContentBlock:
+    type: str = "text"
+    title: str = ""
+    content: str = ""
+
+@dataclass(frozen=True, **_SLOTS)
+class AssessmentQuestion:
+    question: str = ""
+    options: Tuple[str, ...] = ()
+    correct: int = 0  # index into options
+    explanation: str = ""
 
-@dataclass
+@dataclass(frozen=True, **_SLOTS)
+class ScenarioOption:
+    text: str = ""
+    consequence: str = ""
+    ethics_score: int = 0  # out of 10
+
+@dataclass(**_SLOTS)
 class LearningModule:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_new_id)
     title: str = ""
     description: str = ""
     category: ModuleCategory = ModuleCategory.AI_BASICS
     difficulty: DifficultyLevel = DifficultyLevel.BEGINNER
     prerequisites: List[str] = field(default_factory=list)
-    content_blocks: List[Dict[str, Any]] = field(default_factory=list)
+    content_blocks: Tuple[ContentBlock, ...] = ()
     scenarios: List[Dict[str, Any]] = field(default_factory=list)
-    assessment_questions: List[Dict[str, Any]] = field(default_factory=list)
+    assessment_questions: Tuple[AssessmentQuestion, ...] = ()
     estimated_duration: int = 30  # minutes
+    
+    def __post_init__(self):
+        self.id = sys.intern(self.id)
+        self.prerequisites = [sys.intern(prereq) for prereq in self.prerequisites]
+    
+    @property
+    def _sort_key(self) -> Tuple[int, str]:
+        """Learning-path ordering: difficulty, then title."""
+        return (_DIFFICULTY_ORDER[self.difficulty], self.title)
 
-@dataclass
+@dataclass(**_SLOTS)
 class Scenario:
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_new_id)
     title: str = ""
     description: str = ""
     context: str = ""
     challenge: str = ""
-    options: List[Dict[str, Any]] = field(default_factory=list)
+    options: Tuple[ScenarioOption, ...] = ()
     ethical_considerations: List[str] = field(default_factory=list)
     learning_objectives: List[str] = field(default_factory=list)
 
-@dataclass
-class UserProgress:
+class _QuizTotals:
+    """Slots for UserProgress's running quiz totals, kept out of its dataclass fields."""
+    __slots__ = ("_score_sum", "_score_n", "_scores_seen")
+
+@dataclass(**_SLOTS)
+class UserProgress(_QuizTotals):
     user_id: str = ""
     module_id: str = ""
     completion_percentage: float = 0.0
     time_spent: int = 0  # minutes
-    last_accessed: datetime = field(default_factory=datetime.now)
+    last_accessed: int = field(default_factory=_now_us)  # microseconds since epoch
     quiz_scores: List[float] = field(default_factory=list)
     scenario_completions: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        self.user_id = sys.intern(self.user_id)
+        self.module_id = sys.intern(self.module_id)
+        self._scores_seen = None
+        self._sync_scores()
+    
+    def _sync_scores(self):
+        """Recount the running totals if quiz_scores was replaced or resized directly."""
+        scores = self.quiz_scores
+        if scores is not self._scores_seen or len(scores) != self._score_n:
+            self._score_sum = sum(scores)
+            self._score_n = len(scores)
+            self._scores_seen = scores
+    
+    def record_quiz(self, score: float):
+        """Record a quiz score and update the running average."""
+        self._sync_scores()
+        self.quiz_scores.append(score)
+        self._score_sum += score
+        self._score_n += 1
+    
+    @property
+    def avg_score(self) -> float:
+        """Mean of the recorded quiz scores, or 0 if there are none."""
+        self._sync_scores()
+        return self._score_sum / self._score_n if self._score_n else 0.0
+
+class _FormattedActivity:
+    """Slots for ProgressSummary's formatted last_active, kept out of its dataclass fields."""
+    __slots__ = ("_last_active_str", "_formatted_at")
+
+@dataclass(**_SLOTS)
+class ProgressSummary(_FormattedActivity):
+    """Running per-user totals over all of a user's UserProgress records."""
+    time_spent: int = 0  # minutes
+    last_active: int = 0  # microseconds since epoch
+    completion_sum: float = 0.0  # sum of best completion percentages
+    modules_completed: int = 0
+    modules_in_progress: int = 0
+    record_count: int = 0  # UserProgress records folded into these totals
+    
+    def __post_init__(self):
+        self._formatted_at = -1
+    
+    @property
+    def last_active_str(self) -> str:
+        """last_active formatted for display; reformatted only when it changes."""
+        if self._formatted_at != self.last_active:
+            self._last_active_str = _us_to_datetime(self.last_active).strftime('%Y-%m-%d %H:%M')
+            self._formatted_at = self.last_active
+        return self._last_active_str
+
+# One row of the teacher dashboard's student progress table
+StudentRow = namedtuple(
+    "StudentRow",
+    "student_name display_name completion_rate time_spent last_active last_active_str"
+)
+
+def _create_sample_content() -> Tuple[Tuple[LearningModule, ...], Tuple[Scenario, ...]]:
+    """Build the sample modules and scenarios every platform starts with."""
+    
+    # Sample AI Basics Module
+    ai_basics = LearningModule(
+        title="Introduction to Artificial Intelligence",
+        description="Foundational concepts of AI, machine learning, and their real-world applications",
+        category=ModuleCategory.AI_BASICS,
+        difficulty=DifficultyLevel.BEGINNER,
+        content_blocks=(
+            ContentBlock(
+                type="text",
+                title="What is AI?",
+                content="Artificial Intelligence refers to computer systems that can perform tasks typically requiring human intelligence..."
+            ),
+            ContentBlock(
+                type="interactive",
+                title="AI vs Machine Learning vs Deep Learning",
+                content="Interactive diagram showing the relationship between these concepts"
+            ),
+            ContentBlock(
+                type="video",
+                title="AI in Daily Life",
+                content="Examples of AI applications you encounter every day"
+            )
+        ),
+        assessment_questions=(
+            AssessmentQuestion(
+                question="Which of the following is NOT a type of machine learning?",
+                options=("Supervised Learning", "Unsupervised Learning", "Reinforcement Learning", "Quantum Learning"),
+                correct=3,
+                explanation="Quantum Learning is not a recognized type of machine learning paradigm."
+            ),
+        )
+    )
+    
+    # Sample Ethics Module
+    ethics_module = LearningModule(
+        title="AI Ethics and Bias",
+        description="Understanding ethical implications, bias detection, and responsible AI use",
+        category=ModuleCategory.ETHICS_BIAS,
+        difficulty=DifficultyLevel.INTERMEDIATE,
+        prerequisites=[ai_basics.id],
+        content_blocks=(
+            ContentBlock(
+                type="case_study",
+                title="Algorithmic Bias in Hiring",
+                content="Real-world examples of how AI systems can perpetuate discrimination"
+            ),
+            ContentBlock(
+                type="interactive",
+                title="Bias Detection Exercise",
+                content="Interactive tool to identify potential bias in AI systems"
+            )
+        )
+    )
+    
+    # Sample Scenario
+    hiring_scenario = Scenario(
+        title="AI-Powered Hiring System",
+        description="You're implementing an AI system to screen job applications",
+        context="Your company wants to automate the initial screening of resumes using AI to save time and reduce human bias.",
+        challenge="How do you ensure the AI system doesn't discriminate against qualified candidates?",
+        options=(
+            ScenarioOption(
+                text="Use historical hiring data to train the model",
+                consequence="Risk of perpetuating past biases",
+                ethics_score=2
+            ),
+            ScenarioOption(
+                text="Implement bias detection and regular auditing",
+                consequence="Better fairness but requires ongoing monitoring",
+                ethics_score=8
+            ),
+            ScenarioOption(
+                text="Focus only on technical skills and ignore demographics",
+                consequence="May miss important soft skills and context",
+                ethics_score=6
+            )
+        ),
+        ethical_considerations=[
+            "Fairness and non-discrimination",
+            "Transparency in decision-making",
+            "Accountability for AI decisions"
+        ],
+        learning_objectives=[
+            "Identify potential sources of bias in AI systems",
+            "Understand the importance of diverse training data",
+            "Learn strategies for ongoing bias monitoring"
+        ]
+    )
+    
+    return (ai_basics, ethics_module), (hiring_scenario,)
+
+# Built once at import; each platform registers its own copies, so only the
+# immutable content records are shared between instances
+_SAMPLE_MODULES, _SAMPLE_SCENARIOS = _create_sample_content()
+
+# Adaptive feedback per score tier: (message, suggestions, difficulty adjustment).
+# Suggestions are shared read-only tuples.
+_FEEDBACK_TIERS = (
+    (
+        "Consider reviewing the foundational concepts before moving forward.",
+        (
+            "Revisit the basic definitions",
+            "Try the interactive exercises again",
+            "Watch supplementary videos"
+        ),
+        -1
+    ),
+    (
+        "Good progress! Keep practicing to solidify your understanding.",
+        (
+            "Complete additional practice scenarios",
+            "Review areas where you scored lower"
+        ),
+        0
+    ),
+    (
+        "Excellent work! You're ready for more advanced topics.",
+        (
+            "Explore advanced scenarios",
+            "Try the challenge problems",
+            "Consider peer tutoring opportunities"
+        ),
+        1
+    )
+)
 
 class AILiteracyPlatform:
     """Main platform class managing users, modules, and learning paths."""
     
     def __init__(self):
         self.users: Dict[str, User] = {}
-        self.modules: Dict[str, LearningModule] = {}
+        self.modules: Dict[str, LearningModule] = {}  # wrapped by the property setter
         self.scenarios: Dict[str, Scenario] = {}
-        self.user_progress: Dict[str, Dict[str, UserProgress]] = {}
+        self.user_progress: DefaultDict[str, Dict[str, UserProgress]] = defaultdict(dict)
+        self._completed: Dict[str, Set[str]] = {}  # user_id -> ids of modules at >= 90%
+        self._dependents: Dict[str, List[str]] = {}  # prerequisite id -> ids of modules requiring it
+        self._indexed_prereqs: Dict[str, FrozenSet[str]] = {}  # module_id -> prerequisites as indexed
+        self._indexed_modules_version = 0  # self.modules.version reflected in _dependents/_unmet
+        self._unmet: Dict[str, Dict[str, int]] = {}  # user_id -> module_id -> prerequisites not yet completed
+        self._summaries: Dict[str, ProgressSummary] = {}  # user_id -> totals kept by update_progress
+        self._path_cache: Dict[str, List[LearningModule]] = {}  # user_id -> sorted learning path
+        self._feedback_cache: Dict[Tuple[str, str], Tuple[Optional[UserProgress], float, Dict[str, Any]]] = {}
+        self._dirty_progress: Set[Tuple[str, str]] = set()  # (user_id, module_id) not yet written to the database
+        self._synced_db: Optional[str] = None  # absolute path of the database _dirty_progress is relative to
         self._initialize_sample_content()
     
+    @property
+    def modules(self) -> Dict[str, LearningModule]:
+        """Registered modules by id.
+        
+        Prefer add_module, which updates the prerequisite indexes in place;
+        direct edits to this dict are detected and trigger a full reindex.
+        """
+        return self._modules
+    
+    @modules.setter
+    def modules(self, modules: Dict[str, LearningModule]):
+        self._modules = _VersionedDict(modules)
+        self._indexed_modules_version = -1
+    
     def _initialize_sample_content(self):
         """Initialize the platform with sample modules and scenarios."""
-        
-        # Sample AI Basics Module
-        ai_basics = LearningModule(
-            title="Introduction to Artificial Intelligence",
-            description="Foundational concepts of AI, machine learning, and their real-world applications",
-            category=ModuleCategory.AI_BASICS,
-            difficulty=DifficultyLevel.BEGINNER,
-            content_blocks=[
-                {
-                    "type": "text",
-                    "title": "What is AI?",
-                    "content": "Artificial Intelligence refers to computer systems that can perform tasks typically requiring human intelligence..."
-                },
-                {
-                    "type": "interactive",
-                    "title": "AI vs Machine Learning vs Deep Learning",
-                    "content": "Interactive diagram showing the relationship between these concepts"
-                },
-                {
-                    "type": "video",
-                    "title": "AI in Daily Life",
-                    "content": "Examples of AI applications you encounter every day"
-                }
-            ],
-            assessment_questions=[
-                {
-                    "question": "Which of the following is NOT a type of machine learning?",
-                    "options": ["Supervised Learning", "Unsupervised Learning", "Reinforcement Learning", "Quantum Learning"],
-                    "correct": 3,
-                    "explanation": "Quantum Learning is not a recognized type of machine learning paradigm."
-                }
-            ]
-        )
-        
-        # Sample Ethics Module
-        ethics_module = LearningModule(
-            title="AI Ethics and Bias",
-            description="Understanding ethical implications, bias detection, and responsible AI use",
-            category=ModuleCategory.ETHICS_BIAS,
-            difficulty=DifficultyLevel.INTERMEDIATE,
-            prerequisites=[ai_basics.id],
-            content_blocks=[
-                {
-                    "type": "case_study",
-                    "title": "Algorithmic Bias in Hiring",
-                    "content": "Real-world examples of how AI systems can perpetuate discrimination"
-                },
-                {
-                    "type": "interactive",
-                    "title": "Bias Detection Exercise",
-                    "content": "Interactive tool to identify potential bias in AI systems"
-                }
-            ]
-        )
-        
-        # Sample Scenario
-        hiring_scenario = Scenario(
-            title="AI-Powered Hiring System",
-            description="You're implementing an AI system to screen job applications",
-            context="Your company wants to automate the initial screening of resumes using AI to save time and reduce human bias.",
-            challenge="How do you ensure the AI system doesn't discriminate against qualified candidates?",
-            options=[
-                {
-                    "text": "Use historical hiring data to train the model",
-                    "consequence": "Risk of perpetuating past biases",
-                    "ethics_score": 2
-                },
-                {
-                    "text": "Implement bias detection and regular auditing",
-                    "consequence": "Better fairness but requires ongoing monitoring",
-                    "ethics_score": 8
-                },
-                {
-                    "text": "Focus only on technical skills and ignore demographics",
-                    "consequence": "May miss important soft skills and context",
-                    "ethics_score": 6
-                }
-            ],
-            ethical_considerations=[
-                "Fairness and non-discrimination",
-                "Transparency in decision-making",
-                "Accountability for AI decisions"
-            ],
-            learning_objectives=[
-                "Identify potential sources of bias in AI systems",
-                "Understand the importance of diverse training data",
-                "Learn strategies for ongoing bias monitoring"
-            ]
-        )
-        
-        self.modules[ai_basics.id] = ai_basics
-        self.modules[ethics_module.id] = ethics_module
-        self.scenarios[hiring_scenario.id] = hiring_scenario
+        for module in _SAMPLE_MODULES:
+            self.add_module(replace(module, scenarios=list(module.scenarios)))
+        for scenario in _SAMPLE_SCENARIOS:
+            self.scenarios[scenario.id] = replace(
+                scenario,
+                ethical_considerations=list(scenario.ethical_considerations),
+                learning_objectives=list(scenario.learning_objectives)
+            )
+    
+    def add_module(self, module: LearningModule):
+        """Register a learning module and index its prerequisites."""
+        self._sync_module_indexes()
+        # Re-registering replaces the entries made for the module last time,
+        # even if its prerequisite list has since been edited in place
+        for prereq in self._indexed_prereqs.get(module.id, ()):
+            self._dependents[prereq].remove(module.id)
+        self.modules[module.id] = module
+        prereqs = self._indexed_prereqs[module.id] = frozenset(module.prerequisites)
+        for prereq in prereqs:
+            self._dependents.setdefault(prereq, []).append(module.id)
+        for user_id, unmet in self._unmet.items():
+            unmet[module.id] = self._count_unmet(user_id, module)
+        self._path_cache.clear()
+        self._indexed_modules_version = self._modules.version
     
     def create_user(self, username: str, email: str, role: UserRole = UserRole.STUDENT) -> User:
         """Create a new user account."""
         user = User(username=username, email=email, role=role)
         self.users[user.id] = user
         self.user_progress[user.id] = {}
+        self._summaries[user.id] = ProgressSummary(last_active=_datetime_to_us(user.created_at))
         return user
     
-    def get_personalized_learning_path(self, user_id: str) -> List[LearningModule]:
-        """Generate a personalized learning path based on user progress and preferences."""
+    def get_personalized_learning_path(self, user_id: str,
+                                       k: Optional[int] = None) -> List[LearningModule]:
+        """Generate a personalized learning path based on user progress and preferences.
+        
+        If k is given, only the first k modules of the path are returned;
+        a negative k raises ValueError.
+        """
+        if k is not None and k < 0:
+            raise ValueError(f"k must be non-negative, got {k}")
         user = self.users.get(user_id)
         if not user:
             return []
         
-        # Get user's current progress
-        completed_modules = {
-            module_id for module_id, progress in user.progress.items() 
-            if progress >= 90.0
-        }
+        # Paths only change when the user's completed set or the modules change;
+        # edits made directly to self.modules drop every cached path here
+        self._sync_module_indexes()
+        cached = self._path_cache.get(user_id)
+        if cached is not None:
+            return cached[:k] if k is not None else list(cached)
         
-        # Find available modules (prerequisites met)
-        available_modules = []
+        # Sort by difficulty, then title (key precomputed on each module)
+        if k is not None:
+            return heapq.nsmallest(k, self._iter_available_modules(user_id),
+                                   key=attrgetter('_sort_key'))
+        path = sorted(self._iter_available_modules(user_id), key=attrgetter('_sort_key'))
+        self._path_cache[user_id] = path
+        return list(path)
+    
+    def count_available_modules(self, user_id: str) -> int:
+        """Count the modules on a user's learning path without building it."""
+        if user_id not in self.users:
+            return 0
+        self._sync_module_indexes()
+        cached = self._path_cache.get(user_id)
+        if cached is not None:
+            return len(cached)
+        return sum(1 for _ in self._iter_available_modules(user_id))
+    
+    def _iter_available_modules(self, user_id: str) -> Iterator[LearningModule]:
+        """Yield unfinished modules whose prerequisites the user has met, unsorted."""
+        # Get user's current progress (maintained by update_progress)
+        completed_modules = self._get_completed(user_id)
+        unmet = self._get_unmet(user_id)
         for module in self.modules.values():
-            if module.id not in completed_modules:
-                prerequisites_met = all(
-                    prereq in completed_modules 
-                    for prereq in module.prerequisites
-                )
-                if prerequisites_met:
-                    available_modules.append(module)
-        
-        # Sort by difficulty and category preferences
-        def sort_key(module):
-            difficulty_order = {
-                DifficultyLevel.BEGINNER: 1,
-                DifficultyLevel.INTERMEDIATE: 2,
-                DifficultyLevel.ADVANCED: 3
-            }
-            return (difficulty_order[module.difficulty], module.title)
-        
-        return sorted(available_modules, key=sort_key)
+            if not unmet[module.id] and module.id not in completed_modules:
+                yield module
+    
+    def record_quiz_score(self, user_id: str, module_id: str, score: float) -> bool:
+        """Record a quiz score on a user's existing progress for a module."""
+        progress = self.user_progress.get(user_id, {}).get(module_id)
+        if progress is None:
+            return False
+        progress.record_quiz(score)
+        self._dirty_progress.add((user_id, module_id))
+        return True
     
     def update_progress(self, user_id: str, module_id: str, completion_percentage: float, 
                        time_spent: int = 0) -> bool:
         """Update user's progress on a specific module."""
         if user_id not in self.users or module_id not in self.modules:
             return False
+        self._sync_module_indexes()
+        # Fetched before the record changes, so a freshly built summary
+        # does not already include this update
+        summary = self._get_summary(user_id)
+        completed = self._get_completed(user_id)
         
-        if user_id not in self.user_progress:
-            self.user_progress[user_id] = {}
-        
-        if module_id not in self.user_progress[user_id]:
-            self.user_progress[user_id][module_id] = UserProgress(
+        user_modules = self.user_progress[user_id]
+        progress = user_modules.get(module_id)
+        if progress is None:
+            progress = user_modules[module_id] = UserProgress(
                 user_id=user_id, 
                 module_id=module_id
             )
+            summary.record_count += 1
         
-        progress = self.user_progress[user_id][module_id]
-        progress.completion_percentage = max(progress.completion_percentage, completion_percentage)
+        previous = progress.completion_percentage
+        progress.completion_percentage = max(previous, completion_percentage)
         progress.time_spent += time_spent
-        progress.last_accessed = datetime.now()
+        progress.last_accessed = _now_us()
+        self._dirty_progress.add((user_id, module_id))
+        
+        # Fold the change into the user's running totals
+        current = progress.completion_percentage
+        summary.time_spent += time_spent
+        summary.last_active = progress.last_accessed
+        summary.completion_sum += current - previous
+        if current >= 90.0 > previous:
+            summary.modules_completed += 1
+            if previous > 0:
+                summary.modules_in_progress -= 1
+        elif current > 0 >= previous:
+            summary.modules_in_progress += 1
         
         # Update user's overall progress
         self.users[user_id].progress[module_id] = completion_percentage
         
+        # Keep the completed-modules index in sync with the latest percentage
+        is_completed = completion_percentage >= 90.0
+        if is_completed != (module_id in completed):
+            if is_completed:
+                completed.add(module_id)
+                delta = -1
+            else:
+                completed.discard(module_id)
+                delta = 1
+            self._path_cache.pop(user_id, None)
+            # Unlock (or re-lock) the modules that depend on this one
+            unmet = self._unmet.get(user_id)
+            if unmet is not None:
+                for dependent_id in self._dependents.get(module_id, ()):
+                    unmet[dependent_id] += delta
+        
         return True
     
+    def _count_unmet(self, user_id: str, module: LearningModule) -> int:
+        """Count the prerequisites of a module the user has not completed."""
+        return len(set(module.prerequisites) - self._get_completed(user_id))
+    
+    def _get_completed(self, user_id: str) -> Set[str]:
+        """Return the ids of modules the user has completed, building them on first use."""
+        completed = self._completed.get(user_id)
+        if completed is None:
+            user = self.users.get(user_id)
+            progress = user.progress if user is not None else {}
+            completed = self._completed[user_id] = {
+                module_id for module_id, percentage in progress.items()
+                if percentage >= 90.0
+            }
+        return completed
+    
+    def _get_unmet(self, user_id: str) -> Dict[str, int]:
+        """Return the user's unmet-prerequisite counts, building them on first use."""
+        unmet = self._unmet.get(user_id)
+        if unmet is None:
+            unmet = {
+                module_id: self._count_unmet(user_id, module)
+                for module_id, module in self.modules.items()
+            }
+            self._unmet[user_id] = unmet
+        return unmet
+    
+    def _sync_module_indexes(self):
+        """Reindex prerequisites if self.modules was changed other than by add_module."""
+        if self._modules.version != self._indexed_modules_version:
+            self._index_modules()
+    
+    def _index_modules(self):
+        """Rebuild the prerequisite indexes from self.modules."""
+        self._dependents = {}
+        self._indexed_prereqs = {}
+        for module in self.modules.values():
+            prereqs = self._indexed_prereqs[module.id] = frozenset(module.prerequisites)
+            for prereq in prereqs:
+                self._dependents.setdefault(prereq, []).append(module.id)
+        self._unmet = {}  # rebuilt per user on demand
+        self._path_cache = {}
+        self._indexed_modules_version = self._modules.version
+    
+    def _rebuild_indexes(self):
+        """Recompute the derived progress indexes from the loaded users and modules."""
+        self._completed = {
+            user_id: {
+                module_id for module_id, progress in user.progress.items()
+                if progress >= 90.0
+            }
+            for user_id, user in self.users.items()
+        }
+        self._index_modules()
+        self._feedback_cache = {}
+        self._summaries = {
+            user_id: self._build_summary(user) for user_id, user in self.users.items()
+        }
+    
+    def _build_summary(self, user: User) -> ProgressSummary:
+        """Total up a user's existing progress records."""
+        user_modules = self.user_progress.get(user.id, {}).values()
+        percentages = [progress.completion_percentage for progress in user_modules]
+        return ProgressSummary(
+            time_spent=sum(progress.time_spent for progress in user_modules),
+            last_active=max(
+                [_datetime_to_us(user.created_at)]
+                + [progress.last_accessed for progress in user_modules]
+            ),
+            completion_sum=sum(percentages),
+            modules_completed=sum(1 for p in percentages if p >= 90),
+            modules_in_progress=sum(1 for p in percentages if 0 < p < 90),
+            record_count=len(percentages)
+        )
+    
+    def _get_summary(self, user_id: str) -> ProgressSummary:
+        """Return the user's running totals, rebuilding them when they are missing or stale.
+        
+        Records added to or removed from user_progress directly are detected by
+        count; changes to existing records must go through update_progress.
+        """
+        summary = self._summaries.get(user_id)
+        if summary is None or summary.record_count != len(self.user_progress.get(user_id, ())):
+            summary = self._summaries[user_id] = self._build_summary(self.users[user_id])
+        return summary
+    
     def get_adaptive_feedback(self, user_id: str, module_id: str, 
                            user_response: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate AI-powered adaptive feedback based on user performance."""
+        """Generate AI-powered adaptive feedback based on user performance.
+        
+        Results are cached until the user's average quiz score for the module
+        changes; each call returns a fresh copy.
+        """
         user = self.users.get(user_id)
         module = self.modules.get(module_id)
         
         if not user or not module:
             return {"error": "User or module not found"}
         
+        # Feedback depends only on the average of the quiz scores recorded so far
+        progress = self.user_progress.get(user_id, {}).get(module_id)
+        avg_score = progress.avg_score if progress is not None else 0.0
+        key = (user_id, module_id)
+        cached = self._feedback_cache.get(key)
+        if cached is not None and cached[0] is progress and cached[1] == avg_score:
+            # Copy with a fresh list so callers cannot alter the cached entry
+            return dict(cached[2], next_steps=[])
+        
         # Simple adaptive feedback logic (in practice, this would use ML models)
         feedback = {
             "message": "",
-            "suggestions": [],
+            "suggestions": (),
             "next_steps": [],
             "difficulty_adjustment": 0
         }
         
         # Analyze user's response pattern
-        if user_id in self.user_progress and module_id in self.user_progress[user_id]:
-            progress = self.user_progress[user_id][module_id]
-            avg_score = sum(progress.quiz_scores) / len(progress.quiz_scores) if progress.quiz_scores else 0
-            
-            if avg_score < 60:
-                feedback["message"] = "Consider reviewing the foundational concepts before moving forward."
-                feedback["suggestions"] = [
-                    "Revisit the basic definitions",
-                    "Try the interactive exercises again",
-                    "Watch supplementary videos"
-                ]
-                feedback["difficulty_adjustment"] = -1
-            elif avg_score > 85:
-                feedback["message"] = "Excellent work! You're ready for more advanced topics."
-                feedback["suggestions"] = [
-                    "Explore advanced scenarios",
-                    "Try the challenge problems",
-                    "Consider peer tutoring opportunities"
-                ]
-                feedback["difficulty_adjustment"] = 1
-            else:
-                feedback["message"] = "Good progress! Keep practicing to solidify your understanding."
-                feedback["suggestions"] = [
-                    "Complete additional practice scenarios",
-                    "Review areas where you scored lower"
-                ]
+        if progress is not None:
+            # Tier 0: below 60, tier 1: 60-85, tier 2: above 85
+            tier = (avg_score >= 60) + (avg_score > 85)
+            message, suggestions, adjustment = _FEEDBACK_TIERS[tier]
+            feedback["message"] = message
+            feedback["suggestions"] = suggestions
+            feedback["difficulty_adjustment"] = adjustment
         
+        self._feedback_cache[key] = (progress, avg_score, dict(feedback, next_steps=()))
         return feedback
     
     def get_teacher_dashboard_data(self, teacher_id: str) -> Dict[str, Any]:
@@ -298,165 +723,363 @@ class AILiteracyPlatform:
         if not teacher or teacher.role != UserRole.TEACHER:
             return {"error": "Access denied"}
         
-        # In a real system, teachers would be associated with specific classes/students
-        students = [user for user in self.users.values() if user.role == UserRole.STUDENT]
-        
         dashboard_data = {
-            "total_students": len(students),
+            "total_students": 0,
             "student_progress": [],
             "module_completion_rates": {},
             "common_challenges": [],
             "recommendations": []
         }
         
-        # Calculate student progress - FIXED VERSION
-        for student in students:
-            total_modules = len(self.modules)
-            
+        # Calculate student progress and per-module completion counts in a
+        # single pass over the students.
+        # In a real system, teachers would be associated with specific classes/students
+        student_progress = dashboard_data["student_progress"]
+        completion_counts: Dict[str, int] = {}  # module_id -> students at >= 90%
+        for student in self.users.values():
+            if student.role != UserRole.STUDENT:
+                continue
             # Calculate average completion percentage across all modules
             if student.progress:
                 # Average the completion percentages of all modules the student has started
                 avg_completion = sum(student.progress.values()) / len(student.progress)
+                for module_id, percentage in student.progress.items():
+                    if percentage >= 90.0:
+                        completion_counts[module_id] = completion_counts.get(module_id, 0) + 1
             else:
                 avg_completion = 0.0
             
-            # Get total time spent from UserProgress objects
-            total_time_spent = 0
-            last_active = student.created_at
-            
-            if student.id in self.user_progress:
-                for module_progress in self.user_progress[student.id].values():
-                    total_time_spent += module_progress.time_spent
-                    if module_progress.last_accessed > last_active:
-                        last_active = module_progress.last_accessed
-            
-            dashboard_data["student_progress"].append({
-                "student_name": student.username,
-                "completion_rate": avg_completion,  # This now shows the actual average completion
-                "time_spent": total_time_spent,
-                "last_active": last_active
-            })
+            # Time and activity totals are kept up to date by update_progress
+            summary = self._get_summary(student.id)
+            student_progress.append(StudentRow(
+                student.username,
+                student.display_name,
+                avg_completion,  # This now shows the actual average completion
+                summary.time_spent,
+                _us_to_datetime(summary.last_active),
+                summary.last_active_str
+            ))
+        
+        total_students = len(student_progress)
+        dashboard_data["total_students"] = total_students
         
         # Calculate module completion rates (students who completed >= 90%)
         for module_id, module in self.modules.items():
-            completed_count = sum(
-                1 for student in students
-                if student.progress.get(module_id, 0) >= 90.0
-            )
+            completed_count = completion_counts.get(module_id, 0)
             dashboard_data["module_completion_rates"][module.title] = (
-                (completed_count / len(students)) * 100 if students else 0
+                (completed_count / total_students) * 100 if total_students else 0
             )
         
         return dashboard_data
     
-    def save_platform_data(self, filename: str = "ai_literacy_data.json") -> bool:
-        """Save platform data to JSON file for persistence."""
+    def save_platform_data(self, filename: str = "ai_literacy_data.json",
+                           indent: Optional[int] = 2) -> bool:
+        """Save platform data to JSON file for persistence.
+        
+        Pass indent=None for compact output, which uses the much faster C encoder
+        on large platforms.
+        """
         try:
-            data = {
-                "users": {
-                    user_id: {
-                        "id": user.id,
-                        "username": user.username,
-                        "email": user.email,
-                        "role": user.role.value,
-                        "created_at": user.created_at.isoformat(),
-                        "learning_preferences": user.learning_preferences,
-                        "progress": user.progress
-                    }
-                    for user_id, user in self.users.items()
-                },
-                "modules": {
+            # Encode in one call and write once instead of streaming small chunks
+            encoded = json.dumps(self._snapshot(), indent=indent)
+            _write_text(filename, encoded)
+            return True
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return False
+    
+    async def save_platform_data_async(self, filename: str = "ai_literacy_data.json",
+                                       indent: Optional[int] = 2) -> bool:
+        """Save platform data without blocking the event loop on file I/O.
+        
+        The snapshot is encoded on the calling thread, so later updates cannot
+        leak into it; only the file write runs in the default executor.
+        """
+        try:
+            encoded = json.dumps(self._snapshot(), indent=indent)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, _write_text, filename, encoded)
+            return True
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return False
+    
+    def _snapshot(self) -> Dict[str, Any]:
+        """Build the JSON-serializable form of users, modules and progress."""
+        return {
+            "users": {
+                user_id: {
+                    "id": user.id,
+                    "username": user.username,
+                    "email": user.email,
+                    "role": user.role.value,
+                    "created_at": user.created_at.isoformat(),
+                    "learning_preferences": user.learning_preferences,
+                    "progress": user.progress
+                }
+                for user_id, user in self.users.items()
+            },
+            "modules": {
+                module_id: {
+                    "id": module.id,
+                    "title": module.title,
+                    "description": module.description,
+                    "category": module.category.value,
+                    "difficulty": module.difficulty.value,
+                    "prerequisites": module.prerequisites,
+                    "content_blocks": [asdict(block) for block in module.content_blocks],
+                    "scenarios": module.scenarios,
+                    "assessment_questions": [
+                        asdict(question) for question in module.assessment_questions
+                    ],
+                    "estimated_duration": module.estimated_duration
+                }
+                for module_id, module in self.modules.items()
+            },
+            "user_progress": {
+                user_id: {
                     module_id: {
-                        "id": module.id,
-                        "title": module.title,
-                        "description": module.description,
-                        "category": module.category.value,
-                        "difficulty": module.difficulty.value,
-                        "prerequisites": module.prerequisites,
-                        "content_blocks": module.content_blocks,
-                        "scenarios": module.scenarios,
-                        "assessment_questions": module.assessment_questions,
-                        "estimated_duration": module.estimated_duration
+                        "user_id": progress.user_id,
+                        "module_id": progress.module_id,
+                        "completion_percentage": progress.completion_percentage,
+                        "time_spent": progress.time_spent,
+                        "last_accessed": _us_to_datetime(progress.last_accessed).isoformat(),
+                        "quiz_scores": progress.quiz_scores,
+                        "scenario_completions": progress.scenario_completions
                     }
-                    for module_id, module in self.modules.items()
-                },
-                "user_progress": {
-                    user_id: {
-                        module_id: {
-                            "user_id": progress.user_id,
-                            "module_id": progress.module_id,
-                            "completion_percentage": progress.completion_percentage,
-                            "time_spent": progress.time_spent,
-                            "last_accessed": progress.last_accessed.isoformat(),
-                            "quiz_scores": progress.quiz_scores,
-                            "scenario_completions": progress.scenario_completions
-                        }
-                        for module_id, progress in user_modules.items()
-                    }
-                    for user_id, user_modules in self.user_progress.items()
+                    for module_id, progress in user_modules.items()
                 }
+                for user_id, user_modules in self.user_progress.items()
             }
-            
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
+        }
+    
+    def load_platform_data(self, filename: str = "ai_literacy_data.json") -> bool:
+        """Load platform data from JSON file."""
+        try:
+            self._restore(_read_json(filename))
             return True
         except Exception as e:
-            print(f"Error saving data: {e}")
+            print(f"Error loading data: {e}")
             return False
     
-    def load_platform_data(self, filename: str = "ai_literacy_data.json") -> bool:
-        """Load platform data from JSON file."""
+    async def load_platform_data_async(self, filename: str = "ai_literacy_data.json") -> bool:
+        """Load platform data, reading and parsing the file in the default executor."""
         try:
-            with open(filename, 'r') as f:
-                data = json.load(f)
-            
-            # Load users
-            self.users = {}
-            for user_id, user_data in data.get("users", {}).items():
-                user = User(
-                    id=user_data["id"],
-                    username=user_data["username"],
-                    email=user_data["email"],
-                    role=UserRole(user_data["role"]),
-                    created_at=datetime.fromisoformat(user_data["created_at"]),
-                    learning_preferences=user_data["learning_preferences"],
-                    progress=user_data["progress"]
-                )
-                self.users[user_id] = user
-            
-            # Load modules
-            self.modules = {}
-            for module_id, module_data in data.get("modules", {}).items():
-                module = LearningModule(
-                    id=module_data["id"],
-                    title=module_data["title"],
-                    description=module_data["description"],
-                    category=ModuleCategory(module_data["category"]),
-                    difficulty=DifficultyLevel(module_data["difficulty"]),
-                    prerequisites=module_data["prerequisites"],
-                    content_blocks=module_data["content_blocks"],
-                    scenarios=module_data["scenarios"],
-                    assessment_questions=module_data["assessment_questions"],
-                    estimated_duration=module_data["estimated_duration"]
-                )
-                self.modules[module_id] = module
-            
-            # Load user progress
-            self.user_progress = {}
-            for user_id, user_modules in data.get("user_progress", {}).items():
-                self.user_progress[user_id] = {}
-                for module_id, progress_data in user_modules.items():
-                    progress = UserProgress(
-                        user_id=progress_data["user_id"],
-                        module_id=progress_data["module_id"],
-                        completion_percentage=progress_data["completion_percentage"],
-                        time_spent=progress_data["time_spent"],
-                        last_accessed=datetime.fromisoformat(progress_data["last_accessed"]),
-                        quiz_scores=progress_data["quiz_scores"],
-                        scenario_completions=progress_data["scenario_completions"]
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, _read_json, filename)
+            self._restore(data)
+            return True
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            return False
+    
+    def _restore(self, data: Dict[str, Any]):
+        """Replace the platform state with a parsed snapshot."""
+        # The saved records mirror the dataclass fields, so convert the
+        # non-JSON types in place and pass the parsed dicts straight through
+        
+        # Load users
+        self.users = {}
+        for user_id, user_data in data.get("users", {}).items():
+            user_data["role"] = UserRole(user_data["role"])
+            user_data["created_at"] = datetime.fromisoformat(user_data["created_at"])
+            self.users[sys.intern(user_id)] = User(**user_data)
+        
+        # Load modules
+        self.modules = {}
+        for module_id, module_data in data.get("modules", {}).items():
+            module_data["category"] = ModuleCategory(module_data["category"])
+            module_data["difficulty"] = DifficultyLevel(module_data["difficulty"])
+            module_data["content_blocks"] = tuple(
+                ContentBlock(**block) for block in module_data["content_blocks"]
+            )
+            for question in module_data["assessment_questions"]:
+                question["options"] = tuple(question["options"])
+            module_data["assessment_questions"] = tuple(
+                AssessmentQuestion(**question) for question in module_data["assessment_questions"]
+            )
+            self.modules[sys.intern(module_id)] = LearningModule(**module_data)
+        
+        # Load user progress, converting all access times in one batch
+        saved_progress = data.get("user_progress", {})
+        records = [
+            progress_data
+            for user_modules in saved_progress.values()
+            for progress_data in user_modules.values()
+        ]
+        timestamps = _parse_timestamps([record["last_accessed"] for record in records])
+        for record, timestamp in zip(records, timestamps):
+            record["last_accessed"] = timestamp
+        
+        self.user_progress = defaultdict(dict)
+        for user_id, user_modules in saved_progress.items():
+            user_id = sys.intern(user_id)
+            self.user_progress[user_id] = {}
+            for module_id, progress_data in user_modules.items():
+                self.user_progress[user_id][sys.intern(module_id)] = UserProgress(**progress_data)
+        
+        self._rebuild_indexes()
+        self._dirty_progress = {
+            (user_id, module_id)
+            for user_id, user_modules in self.user_progress.items()
+            for module_id in user_modules
+        }
+    
+    def save_progress_to_db(self, filename: str = "ai_literacy.db") -> bool:
+        """Write platform data to a SQLite database, upserting only changed progress rows.
+        
+        Users and modules are snapshotted on every call. Progress records are
+        batched and, when saving to the database last synced with, written only
+        if they changed since then; any other database gets every record.
+        """
+        try:
+            path = os.path.abspath(filename)
+            if path == self._synced_db:
+                changed = self._dirty_progress
+            else:
+                changed = [
+                    (user_id, module_id)
+                    for user_id, user_modules in self.user_progress.items()
+                    for module_id in user_modules
+                ]
+            conn = sqlite3.connect(filename)
+            try:
+                with conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS users ("
+                        "id TEXT PRIMARY KEY, username TEXT, email TEXT, role TEXT, "
+                        "created_at TEXT, learning_preferences TEXT, progress TEXT)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS modules ("
+                        "id TEXT PRIMARY KEY, title TEXT, description TEXT, category TEXT, "
+                        "difficulty TEXT, prerequisites TEXT, content_blocks TEXT, "
+                        "scenarios TEXT, assessment_questions TEXT, estimated_duration INTEGER)"
+                    )
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS user_progress ("
+                        "user_id TEXT, module_id TEXT, completion_percentage REAL, "
+                        "time_spent INTEGER, last_accessed TEXT, quiz_scores TEXT, "
+                        "scenario_completions TEXT, PRIMARY KEY (user_id, module_id))"
+                    )
+                    conn.execute("DELETE FROM users")
+                    conn.executemany(
+                        "INSERT INTO users (id, username, email, role, created_at, "
+                        "learning_preferences, progress) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (user.id, user.username, user.email, user.role.value,
+                             user.created_at.isoformat(), json.dumps(user.learning_preferences),
+                             json.dumps(user.progress))
+                            for user in self.users.values()
+                        ]
                     )
-                    self.user_progress[user_id][module_id] = progress
+                    conn.execute("DELETE FROM modules")
+                    conn.executemany(
+                        "INSERT INTO modules (id, title, description, category, difficulty, "
+                        "prerequisites, content_blocks, scenarios, assessment_questions, "
+                        "estimated_duration) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (module.id, module.title, module.description, module.category.value,
+                             module.difficulty.value, json.dumps(module.prerequisites),
+                             json.dumps([asdict(block) for block in module.content_blocks]),
+                             json.dumps(module.scenarios),
+                             json.dumps([asdict(question) for question in module.assessment_questions]),
+                             module.estimated_duration)
+                            for module in self.modules.values()
+                        ]
+                    )
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO user_progress (user_id, module_id, "
+                        "completion_percentage, time_spent, last_accessed, quiz_scores, "
+                        "scenario_completions) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [
+                            (progress.user_id, progress.module_id, progress.completion_percentage,
+                             progress.time_spent,
+                             _us_to_datetime(progress.last_accessed).isoformat(),
+                             json.dumps(progress.quiz_scores),
+                             json.dumps(progress.scenario_completions))
+                            for progress in (
+                                self.user_progress[user_id][module_id]
+                                for user_id, module_id in changed
+                            )
+                        ]
+                    )
+            finally:
+                conn.close()
+            self._dirty_progress.clear()
+            self._synced_db = path
+            return True
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return False
+    
+    def load_progress_from_db(self, filename: str = "ai_literacy.db") -> bool:
+        """Load platform data from a SQLite database written by save_progress_to_db."""
+        try:
+            conn = sqlite3.connect(filename)
+            try:
+                users = conn.execute(
+                    "SELECT id, username, email, role, created_at, learning_preferences, "
+                    "progress FROM users"
+                ).fetchall()
+                modules = conn.execute(
+                    "SELECT id, title, description, category, difficulty, prerequisites, "
+                    "content_blocks, scenarios, assessment_questions, estimated_duration "
+                    "FROM modules"
+                ).fetchall()
+                progress_rows = conn.execute(
+                    "SELECT user_id, module_id, completion_percentage, time_spent, "
+                    "last_accessed, quiz_scores, scenario_completions FROM user_progress"
+                ).fetchall()
+            finally:
+                conn.close()
             
+            # Rebuild the JSON snapshot layout so _restore does the conversion
+            saved_progress: Dict[str, Dict[str, Any]] = defaultdict(dict)
+            for (user_id, module_id, completion_percentage, time_spent,
+                 last_accessed, quiz_scores, scenario_completions) in progress_rows:
+                saved_progress[user_id][module_id] = {
+                    "user_id": user_id,
+                    "module_id": module_id,
+                    "completion_percentage": completion_percentage,
+                    "time_spent": time_spent,
+                    "last_accessed": last_accessed,
+                    "quiz_scores": json.loads(quiz_scores),
+                    "scenario_completions": json.loads(scenario_completions)
+                }
+            self._restore({
+                "users": {
+                    row[0]: {
+                        "id": row[0],
+                        "username": row[1],
+                        "email": row[2],
+                        "role": row[3],
+                        "created_at": row[4],
+                        "learning_preferences": json.loads(row[5]),
+                        "progress": json.loads(row[6])
+                    }
+                    for row in users
+                },
+                "modules": {
+                    row[0]: {
+                        "id": row[0],
+                        "title": row[1],
+                        "description": row[2],
+                        "category": row[3],
+                        "difficulty": row[4],
+                        "prerequisites": json.loads(row[5]),
+                        "content_blocks": json.loads(row[6]),
+                        "scenarios": json.loads(row[7]),
+                        "assessment_questions": json.loads(row[8]),
+                        "estimated_duration": row[9]
+                    }
+                    for row in modules
+                },
+                "user_progress": saved_progress
+            })
+            # Everything just read already matches the database
+            self._dirty_progress.clear()
+            self._synced_db = os.path.abspath(filename)
             return True
         except Exception as e:
             print(f"Error loading data: {e}")
@@ -486,30 +1109,20 @@ class AILiteracyPlatform:
         }
         
         if student_id in self.user_progress:
-            total_progress = 0
-            total_time = 0
-            all_quiz_scores = []
-            modules_completed = 0
-            modules_in_progress = 0
-            
-            for module_id, progress in self.user_progress[student_id].items():
-                total_progress += progress.completion_percentage
-                total_time += progress.time_spent
-                all_quiz_scores.extend(progress.quiz_scores)
-                
-                if progress.completion_percentage >= 90:
-                    modules_completed += 1
-                elif progress.completion_percentage > 0:
-                    modules_in_progress += 1
-            
+            # Progress and time totals are maintained by update_progress
+            summary = self._get_summary(student_id)
             total_modules = len(self.user_progress[student_id])
             if total_modules > 0:
-                analytics["overall_progress"] = total_progress / total_modules
+                analytics["overall_progress"] = summary.completion_sum / total_modules
             
-            analytics["total_time_spent"] = total_time
-            analytics["modules_completed"] = modules_completed
-            analytics["modules_in_progress"] = modules_in_progress
+            analytics["total_time_spent"] = summary.time_spent
+            analytics["modules_completed"] = summary.modules_completed
+            analytics["modules_in_progress"] = summary.modules_in_progress
             
+            all_quiz_scores = [
+                score for progress in self.user_progress[student_id].values()
+                for score in progress.quiz_scores
+            ]
             if all_quiz_scores:
                 analytics["average_quiz_score"] = sum(all_quiz_scores) / len(all_quiz_scores)
         
@@ -529,47 +1142,48 @@ class AILiteracyPlatform:
         # Prioritize modules based on user's performance in similar categories
         user_progress = self.user_progress.get(user_id, {})
         
-        # Calculate average performance by category
-        category_performance = {}
+        # Accumulate [sum of module averages, module count] per category
+        category_totals = {}
         for module_id, progress in user_progress.items():
             module = self.modules.get(module_id)
             if module and progress.quiz_scores:
-                category = module.category
-                avg_score = sum(progress.quiz_scores) / len(progress.quiz_scores)
-                if category not in category_performance:
-                    category_performance[category] = []
-                category_performance[category].append(avg_score)
-        
-        # Find the best next module
-        best_module = available_modules[0]  # Default to first available
+                avg_score = progress.avg_score
+                totals = category_totals.setdefault(module.category, [0.0, 0])
+                totals[0] += avg_score
+                totals[1] += 1
         
-        # Prefer modules in categories where user performs well
-        for module in available_modules:
-            if module.category in category_performance:
-                avg_category_score = sum(category_performance[module.category]) / len(category_performance[module.category])
-                if avg_category_score > 75:  # Good performance threshold
-                    best_module = module
-                    break
+        # Average each category once rather than per candidate module
+        strong_categories = {
+            category for category, (score_sum, count) in category_totals.items()
+            if score_sum / count > 75  # Good performance threshold
+        }
         
-        return best_module
+        # Prefer modules in categories where user performs well,
+        # defaulting to the first available module
+        return next(
+            (module for module in available_modules if module.category in strong_categories),
+            available_modules[0]
+        )
 
 # Example Usage and Testing
 def demo_platform():
     """Demonstrate the AI Literacy Platform functionality."""
+    # Collect output lines and write them once at the end
+    out: List[str] = []
     platform = AILiteracyPlatform()
     
     # Create users
     student = platform.create_user("alice_student", "alice@example.com", UserRole.STUDENT)
     teacher = platform.create_user("bob_teacher", "bob@example.com", UserRole.TEACHER)
     
-    print(f"Created student: {student.username} (ID: {student.id})")
-    print(f"Created teacher: {teacher.username} (ID: {teacher.id})")
+    out.append(f"Created student: {student.username} (ID: {student.id})")
+    out.append(f"Created teacher: {teacher.username} (ID: {teacher.id})")
     
     # Get learning path for student
     learning_path = platform.get_personalized_learning_path(student.id)
-    print(f"\nPersonalized learning path for {student.username}:")
+    out.append(f"\nPersonalized learning path for {student.username}:")
     for i, module in enumerate(learning_path, 1):
-        print(f"{i}. {module.title} ({module.difficulty.value})")
+        out.append(f"{i}. {module.title} ({module.difficulty.value})")
     
     # Simulate progress
     if learning_path:
@@ -583,17 +1197,19 @@ def demo_platform():
             first_module.id, 
             {"quiz_score": 78, "time_spent": 45}
         )
-        print(f"\nAdaptive feedback: {feedback['message']}")
-        print("Suggestions:", feedback['suggestions'])
+        out.append(f"\nAdaptive feedback: {feedback['message']}")
+        out.append(f"Suggestions: {feedback['suggestions']}")
     
     # Teacher dashboard
     dashboard = platform.get_teacher_dashboard_data(teacher.id)
-    print(f"\nTeacher Dashboard:")
-    print(f"Total students: {dashboard['total_students']}")
-    print("Student progress:", dashboard['student_progress'])
+    out.append(f"\nTeacher Dashboard:")
+    out.append(f"Total students: {dashboard['total_students']}")
+    out.append(f"Student progress: {dashboard['student_progress']}")
+    sys.stdout.write("\n".join(out) + "\n")
 
 def demo_new_features():
     """Demonstrate the new features added to the platform."""
+    out: List[str] = []
     platform = AILiteracyPlatform()
     
     # Create test users
@@ -601,43 +1217,44 @@ def demo_new_features():
     teacher = platform.create_user("test_teacher", "teacher@test.com", UserRole.TEACHER)
     
     # Add some progress
-    ai_basics_id = list(platform.modules.keys())[0]
+    ai_basics_id = next(iter(platform.modules))
     platform.update_progress(student.id, ai_basics_id, 85.0, 60)
     
     # Add quiz scores
-    if student.id in platform.user_progress and ai_basics_id in platform.user_progress[student.id]:
-        platform.user_progress[student.id][ai_basics_id].quiz_scores = [78, 82, 88, 85]
+    for score in [78, 82, 88, 85]:
+        platform.record_quiz_score(student.id, ai_basics_id, score)
     
-    print("🔍 STUDENT ANALYTICS EXAMPLE:")
+    out.append("🔍 STUDENT ANALYTICS EXAMPLE:")
     analytics = platform.get_student_analytics(student.id)
-    print(f"Student: {analytics['student_info']['name']}")
-    print(f"Overall Progress: {analytics['overall_progress']:.1f}%")
-    print(f"Total Time Spent: {analytics['total_time_spent']} minutes")
-    print(f"Average Quiz Score: {analytics['average_quiz_score']:.1f}")
-    print(f"Modules Completed: {analytics['modules_completed']}")
-    print(f"Modules In Progress: {analytics['modules_in_progress']}")
-    
-    print("\n🎯 MODULE RECOMMENDATION:")
+    out.append(f"Student: {analytics['student_info']['name']}")
+    out.append(f"Overall Progress: {analytics['overall_progress']:.1f}%")
+    out.append(f"Total Time Spent: {analytics['total_time_spent']} minutes")
+    out.append(f"Average Quiz Score: {analytics['average_quiz_score']:.1f}")
+    out.append(f"Modules Completed: {analytics['modules_completed']}")
+    out.append(f"Modules In Progress: {analytics['modules_in_progress']}")
+    
+    out.append("\n🎯 MODULE RECOMMENDATION:")
     recommended = platform.recommend_next_module(student.id)
     if recommended:
-        print(f"Recommended: {recommended.title}")
-        print(f"Difficulty: {recommended.difficulty.value}")
-        print(f"Category: {recommended.category.value}")
+        out.append(f"Recommended: {recommended.title}")
+        out.append(f"Difficulty: {recommended.difficulty.value}")
+        out.append(f"Category: {recommended.category.value}")
     
-    print("\n💾 DATA PERSISTENCE TEST:")
+    out.append("\n💾 DATA PERSISTENCE TEST:")
     # Test saving data
     if platform.save_platform_data("test_data.json"):
-        print("✅ Data saved successfully!")
+        out.append("✅ Data saved successfully!")
         
         # Create new platform and load data
         new_platform = AILiteracyPlatform()
         if new_platform.load_platform_data("test_data.json"):
-            print("✅ Data loaded successfully!")
-            print(f"Loaded {len(new_platform.users)} users and {len(new_platform.modules)} modules")
+            out.append("✅ Data loaded successfully!")
+            out.append(f"Loaded {len(new_platform.users)} users and {len(new_platform.modules)} modules")
         else:
-            print("❌ Failed to load data")
+            out.append("❌ Failed to load data")
     else:
-        print("❌ Failed to save data")
+        out.append("❌ Failed to save data")
+    sys.stdout.write("\n".join(out) + "\n")
 
 if __name__ == "__main__":
     # Run the basic demo first
@@ -651,8 +1268,9 @@ if __name__ == "__main__":
     demo_new_features()
     
     # Then run the enhanced demo
-    print("\n🚀 ENHANCED PLATFORM DEMONSTRATION:")
-    print("="*60)
+    out = []
+    out.append("\n🚀 ENHANCED PLATFORM DEMONSTRATION:")
+    out.append("="*60)
     
     platform = AILiteracyPlatform()
     
@@ -665,106 +1283,123 @@ if __name__ == "__main__":
     teacher = platform.create_user("dr_smith", "smith@school.edu", UserRole.TEACHER)
     
     # Simulate different levels of progress for each student
-    ai_basics_id = list(platform.modules.keys())[0]
-    ethics_id = list(platform.modules.keys())[1]
+    module_ids = iter(platform.modules)
+    ai_basics_id = next(module_ids)
+    ethics_id = next(module_ids)
     
     # Emma - High performer (100% on AI Basics)
     platform.update_progress(students[0].id, ai_basics_id, 100.0, 45)
-    if students[0].id in platform.user_progress and ai_basics_id in platform.user_progress[students[0].id]:
-        platform.user_progress[students[0].id][ai_basics_id].quiz_scores = [88, 92, 85, 90]
+    for score in [88, 92, 85, 90]:
+        platform.record_quiz_score(students[0].id, ai_basics_id, score)
     
     # James - Average performer (70% on AI Basics)
     platform.update_progress(students[1].id, ai_basics_id, 70.0, 60)
-    if students[1].id in platform.user_progress and ai_basics_id in platform.user_progress[students[1].id]:
-        platform.user_progress[students[1].id][ai_basics_id].quiz_scores = [65, 72, 68]
+    for score in [65, 72, 68]:
+        platform.record_quiz_score(students[1].id, ai_basics_id, score)
     
     # Maria - Struggling (40% on AI Basics)
     platform.update_progress(students[2].id, ai_basics_id, 40.0, 80)
-    if students[2].id in platform.user_progress and ai_basics_id in platform.user_progress[students[2].id]:
-        platform.user_progress[students[2].id][ai_basics_id].quiz_scores = [45, 52, 48]
-    
-    print("\n📚 SAMPLE MODULE STRUCTURE:")
-    for module_id, module in platform.modules.items():
-        print(f"\n🎯 {module.title}")
-        print(f"   Category: {module.category.value.replace('_', ' ').title()}")
-        print(f"   Difficulty: {module.difficulty.value.title()}")
-        print(f"   Duration: {module.estimated_duration} minutes")
-        print(f"   Content Blocks: {len(module.content_blocks)}")
-        print(f"   Assessment Questions: {len(module.assessment_questions)}")
-        if module.prerequisites:
-            print(f"   Prerequisites: {len(module.prerequisites)} required")
-    
-    print("\n👥 STUDENT PROGRESS EXAMPLES:")
+    for score in [45, 52, 48]:
+        platform.record_quiz_score(students[2].id, ai_basics_id, score)
+    
+    out.append("\n📚 SAMPLE MODULE STRUCTURE:")
+    for module in platform.modules.values():
+        out.append(f"\n🎯 {module.title}")
+        out.append(f"   Category: {module.category.display}")
+        out.append(f"   Difficulty: {module.difficulty.display}")
+        out.append(f"   Duration: {module.estimated_duration} minutes")
+        out.append(f"   Content Blocks: {len(module.content_blocks)}")
+        out.append(f"   Assessment Questions: {len(module.assessment_questions)}")
+        n = len(module.prerequisites)
+        if n:
+            out.append(f"   Prerequisites: {n} required")
+    
+    out.append("\n👥 STUDENT PROGRESS EXAMPLES:")
+    module_titles = {module_id: module.title for module_id, module in platform.modules.items()}
     for student in students:
-        print(f"\n📊 {student.username.replace('_', ' ').title()}:")
-        learning_path = platform.get_personalized_learning_path(student.id)
-        print(f"   Available Modules: {len(learning_path)}")
+        out.append(f"\n📊 {student.display_name}:")
+        out.append(f"   Available Modules: {platform.count_available_modules(student.id)}")
         
         for module_id, progress in student.progress.items():
-            module_name = platform.modules[module_id].title
-            print(f"   • {module_name}: {progress:.1f}% complete")
+            out.append(f"   • {module_titles[module_id]}: {progress:.1f}% complete")
         
         # Show adaptive feedback for each student
-        if student.progress:
-            module_id = list(student.progress.keys())[0]
+        module_id = next(iter(student.progress), None)
+        if module_id is not None:
             feedback = platform.get_adaptive_feedback(student.id, module_id, {"quiz_score": 75})
-            print(f"   💡 Feedback: {feedback['message']}")
+            out.append(f"   💡 Feedback: {feedback['message']}")
             if feedback['suggestions']:
-                print(f"   📝 Suggestions: {', '.join(feedback['suggestions'][:2])}")
-    
-    print("\n🎲 SAMPLE SCENARIO OUTPUT:")
-    scenario = list(platform.scenarios.values())[0]
-    print(f"\n📋 Scenario: {scenario.title}")
-    print(f"📝 Context: {scenario.context}")
-    print(f"🎯 Challenge: {scenario.challenge}")
-    print("\n💭 Decision Options:")
+                out.append(f"   📝 Suggestions: {', '.join(feedback['suggestions'][:2])}")
+    
+    out.append("\n🎲 SAMPLE SCENARIO OUTPUT:")
+    scenario = next(iter(platform.scenarios.values()))
+    out.append(f"\n📋 Scenario: {scenario.title}")
+    out.append(f"📝 Context: {scenario.context}")
+    out.append(f"🎯 Challenge: {scenario.challenge}")
+    out.append("\n💭 Decision Options:")
+    option_row = (
+        "   {}. {}\n"
+        "      → Consequence: {}\n"
+        "      → Ethics Score: {}/10"
+    ).format
     for i, option in enumerate(scenario.options, 1):
-        print(f"   {i}. {option['text']}")
-        print(f"      → Consequence: {option['consequence']}")
-        print(f"      → Ethics Score: {option['ethics_score']}/10")
+        out.append(option_row(i, option.text, option.consequence, option.ethics_score))
     
-    print("\n🔍 ETHICAL CONSIDERATIONS:")
+    out.append("\n🔍 ETHICAL CONSIDERATIONS:")
     for consideration in scenario.ethical_considerations:
-        print(f"   • {consideration}")
+        out.append(f"   • {consideration}")
     
-    print("\n🎓 LEARNING OBJECTIVES:")
+    out.append("\n🎓 LEARNING OBJECTIVES:")
     for objective in scenario.learning_objectives:
-        print(f"   • {objective}")
+        out.append(f"   • {objective}")
     
-    print("\n📈 TEACHER DASHBOARD SAMPLE:")
+    out.append("\n📈 TEACHER DASHBOARD SAMPLE:")
     dashboard = platform.get_teacher_dashboard_data(teacher.id)
-    print(f"👨‍🏫 Teacher: {teacher.username.replace('_', ' ').title()}")
-    print(f"📊 Class Overview:")
-    print(f"   Total Students: {dashboard['total_students']}")
-    print(f"   Module Completion Rates:")
+    out.append(f"👨‍🏫 Teacher: {teacher.display_name}")
+    out.append(f"📊 Class Overview:")
+    out.append(f"   Total Students: {dashboard['total_students']}")
+    out.append(f"   Module Completion Rates:")
+    rate_row = "   • {}: {:.1f}%".format
     for module, rate in dashboard['module_completion_rates'].items():
-        print(f"   • {module}: {rate:.1f}%")
+        out.append(rate_row(module, rate))
     
-    print(f"\n👥 Individual Student Progress:")
+    out.append(f"\n👥 Individual Student Progress:")
+    student_row = (
+        "   📚 {}:\n"
+        "      Overall Completion: {:.1f}%\n"
+        "      Time Spent: {} minutes\n"
+        "      Last Active: {}"
+    ).format
     for student_data in dashboard['student_progress']:
-        print(f"   📚 {student_data['student_name'].replace('_', ' ').title()}:")
-        print(f"      Overall Completion: {student_data['completion_rate']:.1f}%")
-        print(f"      Time Spent: {student_data['time_spent']} minutes")
-        print(f"      Last Active: {student_data['last_active'].strftime('%Y-%m-%d %H:%M')}")
+        out.append(student_row(
+            student_data.display_name,
+            student_data.completion_rate,
+            student_data.time_spent,
+            student_data.last_active_str
+        ))
     
-    print("\n🎯 ASSESSMENT QUESTION EXAMPLE:")
-    module = list(platform.modules.values())[0]
+    out.append("\n🎯 ASSESSMENT QUESTION EXAMPLE:")
+    module = next(iter(platform.modules.values()))
     if module.assessment_questions:
         question = module.assessment_questions[0]
-        print(f"❓ {question['question']}")
-        for i, option in enumerate(question['options'], 1):
-            marker = "✓" if i-1 == question['correct'] else " "
-            print(f"   {marker} {i}. {option}")
-        print(f"💡 Explanation: {question['explanation']}")
+        out.append(f"❓ {question.question}")
+        markers = [" "] * len(question.options)
+        if 0 <= question.correct < len(markers):
+            markers[question.correct] = "✓"
+        for i, (marker, option) in enumerate(zip(markers, question.options), 1):
+            out.append(f"   {marker} {i}. {option}")
+        out.append(f"💡 Explanation: {question.explanation}")
     
-    print("\n🚀 PERSONALIZED LEARNING PATH EXAMPLE:")
+    out.append("\n🚀 PERSONALIZED LEARNING PATH EXAMPLE:")
     student = students[0]  # Emma - high performer
     path = platform.get_personalized_learning_path(student.id)
-    print(f"📚 Recommended path for {student.username.replace('_', ' ').title()}:")
+    out.append(f"📚 Recommended path for {student.display_name}:")
     for i, module in enumerate(path, 1):
-        prerequisites = f" (requires {len(module.prerequisites)} prerequisites)" if module.prerequisites else ""
-        print(f"   {i}. {module.title} - {module.difficulty.value.title()}{prerequisites}")
+        n = len(module.prerequisites)
+        prerequisites = f" (requires {n} prerequisites)" if n else ""
+        out.append(f"   {i}. {module.title} - {module.difficulty.display}{prerequisites}")
     
-    print("\n" + "="*60)
-    print("END OF PLATFORM DEMONSTRATION")
-    print("="*60)
\ No newline at end of file
+    out.append("\n" + "="*60)
+    out.append("END OF PLATFORM DEMONSTRATION")
+    out.append("="*60)
+    sys.stdout.write("\n".join(out) + "\n")
\ No newline at end of file